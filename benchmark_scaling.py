@@ -0,0 +1,29 @@
+"""
+Use this script to measure the time and memory of each phase of the reduction
+on generated graphs of increasing size.
+2 parameters : sizes and densities (separate with ':')
+Optional parameter : weights variant ("g" or "gb", DIMACS weights by default)
+The results are saved in benchmark_scaling.csv (after each instance) and plotted
+in benchmark_scaling.png
+Graph builds an adjacency matrix of about 8 * n^2 bytes (800 MB for 10000 vertices,
+80 GB for 100000 vertices), the sizes whose matrix doesn't fit in the available
+memory are skipped
+
+example:
+    python3 benchmark_scaling.py 2000:5000:10000 0.01:0.1
+    python3 benchmark_scaling.py 10000:20000:30000 0.001 gb
+
+"""
+from graph_reduction.benchmark import scaling_benchmark, plot_benchmark
+
+import sys
+
+if __name__ == "__main__":
+    sizes = list(map(int, sys.argv[1].split(":")))
+    densities = list(map(float, sys.argv[2].split(":")))
+    variant = sys.argv[3] if len(sys.argv) > 3 else ""
+
+    rows = scaling_benchmark(
+        sizes, densities, variant=variant, output_file="benchmark_scaling.csv"
+    )
+    plot_benchmark(rows, "benchmark_scaling.png")
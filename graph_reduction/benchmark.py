@@ -0,0 +1,323 @@
+"""
+Measure the time and memory of each phase of the reduction on generated graphs
+"""
+from typing import List, Tuple, Dict, Callable, Any, Optional
+import csv
+import os
+import tempfile
+import time
+import tracemalloc
+
+from graph_reduction.conversion import Solution, load_conversion
+from graph_reduction.generator import FAMILIES, generate_instance, instance_name
+from graph_reduction.graph import Graph, load_graph
+from graph_reduction.reduction import compute_cliques
+
+PHASES = (
+    "load_graph",
+    "sort_vertices",
+    "cliques",
+    "reduction_1",
+    "reduction_2",
+    "convert_to_nodes",
+    "convert_solution",
+)
+
+FIELDS = (
+    "instance",
+    "family",
+    "nb_vertices",
+    "density",
+    "nb_edges",
+    "phase",
+    "status",
+    "time",
+    "peak_memory",
+)
+
+
+class _PhaseFailed(Exception):
+    """Stop the benchmark of an instance when a phase fails"""
+
+
+def adjacency_matrix_size(nb_vertices: int) -> int:
+    """Estimation of the memory (in bytes) of the adjacency matrix of Graph
+    (a list of nb_vertices lists of nb_vertices references)"""
+    return 8 * nb_vertices * nb_vertices
+
+
+def available_memory() -> Optional[int]:
+    """Available physical memory in bytes (None if unknown)"""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_AVPHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def _measure(phase: Callable[[], Any], trace_memory: bool) -> Tuple[Any, float, int]:
+    """Run the phase and measure its time or its peak memory
+
+    :return: result of the phase, time in seconds, peak memory in bytes
+             (0 if the memory is not traced)
+    :rtype: Tuple[Any, float, int]
+    """
+    if trace_memory:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    result = phase()
+    duration = time.perf_counter() - start
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        return result, duration, peak - before
+    return result, duration, 0
+
+
+def _greedy_coloring(graph: Graph) -> List[int]:
+    colors: List[int] = [-1] * graph.nb_vertices
+    for vertex in range(graph.nb_vertices):
+        used = {colors[neighbor] for neighbor in graph.neighborhood[vertex]}
+        colors[vertex] = min(set(range(len(used) + 1)) - used)
+    return colors
+
+
+def _convert_solution(graph: Graph, base: str) -> None:
+    """Convert a greedy coloring of the reduced graph to the graph"""
+    reduced = load_graph(f"{base}.edgelist", f"{base}.col.w")
+    colors = _greedy_coloring(reduced)
+    if not colors:
+        return
+    solution = Solution(graph, colors, load_conversion(f"{base}.conv"))
+    solution.check_solution(solution.current_score)
+
+
+def benchmark_instance(
+    edges_file: str, weights_file: str, timeout: int, trace_memory: bool
+) -> Dict[str, Tuple[str, float, int]]:
+    """Run the first step of the reduction (see reduction.reduction)
+    and the conversion of a solution on an instance
+
+    :param edges_file: edgelist file of the instance
+    :type edges_file: str
+    :param weights_file: col.w file of the instance
+    :type weights_file: str
+    :param timeout: max time to compute the cliques
+    :type timeout: int
+    :param trace_memory: measure the peak memory of each phase
+                         (the times are slower when the memory is traced,
+                         the cliques are computed in another process so
+                         their memory is not traced)
+    :type trace_memory: bool
+    :return: status (ok, memory_error or not_run if a previous phase failed),
+             time and peak memory of each phase
+    :rtype: Dict[str, Tuple[str, float, int]]
+    """
+    measures: Dict[str, Tuple[str, float, int]] = {
+        phase: ("not_run", 0.0, 0) for phase in PHASES
+    }
+
+    def run(name: str, phase: Callable[[], Any]) -> Any:
+        try:
+            result, duration, peak = _measure(phase, trace_memory)
+        except MemoryError as error:
+            measures[name] = ("memory_error", 0.0, 0)
+            raise _PhaseFailed(name) from error
+        measures[name] = ("ok", duration, peak)
+        return result
+
+    with tempfile.TemporaryDirectory() as directory:
+        if trace_memory:
+            tracemalloc.start()
+        try:
+            graph = run("load_graph", lambda: load_graph(edges_file, weights_file))
+            run(
+                "sort_vertices",
+                lambda: graph.convert_to_nodes(f"{directory}/g_0", True),
+            )
+            del graph
+            run(
+                "cliques",
+                lambda: compute_cliques(
+                    f"{directory}/g_0.edgelist", timeout, f"{directory}/cliques"
+                ),
+            )
+            graph = load_graph(f"{directory}/g_0.edgelist", f"{directory}/g_0.col.w")
+            run("reduction_1", lambda: graph.reduction_1(f"{directory}/cliques"))
+            run("reduction_2", graph.reduction_2)
+            run(
+                "convert_to_nodes",
+                lambda: graph.convert_to_nodes(f"{directory}/g_1", True),
+            )
+            del graph
+            graph = load_graph(f"{directory}/g_0.edgelist", f"{directory}/g_0.col.w")
+            run(
+                "convert_solution",
+                lambda: _convert_solution(graph, f"{directory}/g_1"),
+            )
+        except _PhaseFailed as error:
+            print(f"MemoryError during {error}")
+        finally:
+            if trace_memory:
+                tracemalloc.stop()
+    return measures
+
+
+def scaling_benchmark(
+    sizes: List[int],
+    densities: List[float],
+    families: Tuple[str, ...] = FAMILIES,
+    variant: str = "",
+    output_file: str = "benchmark_scaling.csv",
+    timeout: int = 10,
+    seed: int = 0,
+    max_memory: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Generate an instance for each family, size and density and measure
+    the time (first run) and the peak memory (second run) of each phase
+
+    The rows of each instance are written in output_file as soon as the instance
+    is done. Graph builds an adjacency matrix of nb_vertices^2 references,
+    the sizes whose matrix doesn't fit in max_memory are skipped.
+
+    :param sizes: numbers of vertices
+    :type sizes: List[int]
+    :param densities: densities of the graphs
+    :type densities: List[float]
+    :param families: families of graphs, defaults to FAMILIES
+    :type families: Tuple[str, ...]
+    :param variant: weights of the original instances (""), "g" or "gb",
+                    defaults to ""
+    :type variant: str
+    :param output_file: csv file of the results, defaults to "benchmark_scaling.csv"
+    :type output_file: str
+    :param timeout: max time to compute the cliques, defaults to 10
+    :type timeout: int
+    :param seed: seed of the generator, defaults to 0
+    :type seed: int
+    :param max_memory: memory available for the adjacency matrix in bytes,
+                       defaults to None (available physical memory)
+    :type max_memory: Optional[int]
+    :return: one row per instance and phase
+    :rtype: List[Dict[str, Any]]
+    """
+    if max_memory is None:
+        max_memory = available_memory()
+    rows: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as directory, open(
+        output_file, "w", encoding="utf8", newline=""
+    ) as output:
+        writer = csv.DictWriter(output, fieldnames=FIELDS)
+        writer.writeheader()
+        output.flush()
+        for family in families:
+            for density in densities:
+                for nb_vertices in sizes:
+                    if (
+                        max_memory is not None
+                        and adjacency_matrix_size(nb_vertices) > max_memory
+                    ):
+                        print(
+                            f"skip {family} {nb_vertices} {density} : the adjacency "
+                            f"matrix needs {adjacency_matrix_size(nb_vertices)} bytes "
+                            f"({max_memory} available)"
+                        )
+                        name = instance_name(family, nb_vertices, density, variant)
+                        nb_edges = 0
+                        measures = {phase: ("skipped", 0.0, 0) for phase in PHASES}
+                    else:
+                        name, nb_edges = generate_instance(
+                            directory, family, nb_vertices, density, variant, seed
+                        )
+                        print(name, nb_edges)
+                        base = f"{directory}/{name}"
+                        measures = benchmark_instance(
+                            f"{base}.edgelist", f"{base}.col.w", timeout, False
+                        )
+                        # the memory is only traced if all phases passed
+                        if all(status == "ok" for status, _, _ in measures.values()):
+                            memory = benchmark_instance(
+                                f"{base}.edgelist", f"{base}.col.w", timeout, True
+                            )
+                            measures = {
+                                phase: (memory[phase][0], duration, memory[phase][2])
+                                for phase, (_, duration, _) in measures.items()
+                            }
+                        os.remove(f"{base}.edgelist")
+                        os.remove(f"{base}.col.w")
+                    instance_rows = [
+                        {
+                            "instance": name,
+                            "family": family,
+                            "nb_vertices": nb_vertices,
+                            "density": density,
+                            "nb_edges": nb_edges,
+                            "phase": phase,
+                            "status": measures[phase][0],
+                            "time": measures[phase][1],
+                            "peak_memory": measures[phase][2],
+                        }
+                        for phase in PHASES
+                    ]
+                    writer.writerows(instance_rows)
+                    output.flush()
+                    rows += instance_rows
+    return rows
+
+
+def plot_benchmark(rows: List[Dict[str, Any]], output_file: str) -> None:
+    """Plot the time and the peak memory of each phase against the number
+    of vertices (one line per family and density, only the instances where all
+    phases have an ok status), needs matplotlib
+
+    :param rows: results of scaling_benchmark
+    :type rows: List[Dict[str, Any]]
+    :param output_file: image file
+    :type output_file: str
+    """
+    import matplotlib  # pylint: disable=import-outside-toplevel
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
+
+    figure, axes = plt.subplots(
+        2, len(PHASES), figsize=(4 * len(PHASES), 8), squeeze=False
+    )
+    failed = {row["instance"] for row in rows if row["status"] != "ok"}
+    rows = [row for row in rows if row["instance"] not in failed]
+    series = sorted({(row["family"], float(row["density"])) for row in rows})
+    for column, phase in enumerate(PHASES):
+        for family, density in series:
+            points = sorted(
+                (int(row["nb_vertices"]), float(row["time"]), int(row["peak_memory"]))
+                for row in rows
+                if row["phase"] == phase
+                and row["family"] == family
+                and float(row["density"]) == density
+            )
+            label = f"{family} {density:g}"
+            axes[0][column].plot(
+                [point[0] for point in points],
+                [point[1] for point in points],
+                marker="o",
+                label=label,
+            )
+            axes[1][column].plot(
+                [point[0] for point in points],
+                [point[2] / 2**20 for point in points],
+                marker="o",
+                label=label,
+            )
+        axes[0][column].set_title(phase)
+        axes[1][column].set_xlabel("vertices")
+    axes[0][0].set_ylabel("time (s)")
+    axes[1][0].set_ylabel("peak memory (MiB)")
+    axes[0][0].legend()
+    figure.tight_layout()
+    figure.savefig(output_file)
+    plt.close(figure)
+
+
+def load_benchmark(csv_file: str) -> List[Dict[str, Any]]:
+    """Load the results saved by scaling_benchmark"""
+    with open(csv_file, "r", encoding="utf8") as file:
+        return list(csv.DictReader(file))
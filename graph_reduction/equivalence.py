@@ -0,0 +1,464 @@
+"""
+Compare alternative implementations of the reductions, of the conversion to nodes
+and of the solution with the reference implementations, the outputs
+(conversion files, reduced graphs, converted colorings) must be identical
+"""
+from typing import List, Tuple, Dict, Callable, Any, Optional
+import copy
+import itertools
+import os
+import random
+import tempfile
+import time
+from glob import glob
+
+from graph_reduction.graph import Graph, load_graph
+from graph_reduction.conversion import Solution, load_conversion
+
+# A case is a weighted graph : weights and edges (vertex1, vertex2)
+Case = Tuple[List[int], List[Tuple[int, int]]]
+
+# Reference implementations, the alternatives must have the same signature
+REFERENCES: Dict[str, Callable] = {
+    "reduction_1": Graph.reduction_1,
+    "reduction_2": Graph.reduction_2,
+    "convert_to_nodes": Graph.convert_to_nodes,
+    "Solution": Solution,
+}
+
+# Registered alternative implementations (target -> name -> implementation)
+ALTERNATIVES: Dict[str, Dict[str, Callable]] = {target: {} for target in REFERENCES}
+
+
+def register(target: str, name: str, implementation: Callable) -> None:
+    """Register an alternative implementation of a target
+
+    The implementation takes the same parameters as the reference
+    (the graph first for the methods of Graph) :
+        reduction_1(graph, cliques_file) -> int
+        reduction_2(graph) -> int
+        convert_to_nodes(graph, output_file_base, only_conv_ed_w)
+        Solution(graph, colors, conversion) -> object with colors and current_score
+
+    :param target: reduction_1, reduction_2, convert_to_nodes or Solution
+    :type target: str
+    :param name: name of the implementation
+    :type name: str
+    :param implementation: the alternative implementation
+    :type implementation: Callable
+    """
+    assert target in REFERENCES, f"unknown target {target}"
+    ALTERNATIVES[target][name] = implementation
+
+
+def random_case(rng: random.Random, nb_vertices: int, density: float) -> Case:
+    """Generate a random weighted graph, weights are taken in a small range
+    to create ties between vertices
+
+    :param rng: random generator
+    :type rng: random.Random
+    :param nb_vertices: number of vertices
+    :type nb_vertices: int
+    :param density: probability of each edge
+    :type density: float
+    :return: the random case
+    :rtype: Case
+    """
+    weights = [rng.randint(1, max(2, nb_vertices // 4)) for _ in range(nb_vertices)]
+    edges = [
+        (vertex1, vertex2)
+        for vertex1 in range(nb_vertices)
+        for vertex2 in range(vertex1 + 1, nb_vertices)
+        if rng.random() < density
+    ]
+    return weights, edges
+
+
+def random_cases(nb_cases: int, max_vertices: int = 30, seed: int = 0) -> List[Case]:
+    """Generate random cases of different sizes and densities"""
+    rng = random.Random(seed)
+    return [
+        random_case(rng, rng.randint(1, max_vertices), rng.random())
+        for _ in range(nb_cases)
+    ]
+
+
+def bundled_cases(
+    path_to_instance_rep: str = ".", max_vertices: int = 250
+) -> List[Case]:
+    """Load the original instances with at most max_vertices vertices"""
+    cases: List[Case] = []
+    for edges_file in sorted(glob(f"{path_to_instance_rep}/wvcp_original/*.edgelist")):
+        weights_file = f"{edges_file[:-len('.edgelist')]}.col.w"
+        if not os.path.exists(weights_file):
+            continue
+        with open(weights_file, "r", encoding="utf8") as file:
+            if len(file.readlines()) > max_vertices:
+                continue
+        graph = load_graph(edges_file, weights_file)
+        cases.append(
+            (
+                graph.weights,
+                [
+                    (vertex1, vertex2)
+                    for vertex1 in range(graph.nb_vertices)
+                    for vertex2 in graph.neighborhood[vertex1]
+                    if vertex1 < vertex2
+                ],
+            )
+        )
+    return cases
+
+
+def build_graph(case: Case) -> Graph:
+    """Create the graph of the case"""
+    weights, edges = case
+    return Graph("case", len(weights), edges, weights[:])
+
+
+def greedy_cliques(graph: Graph) -> List[List[int]]:
+    """Compute cliques of at least 3 vertices with a greedy algorithm,
+    the reduction is valid with any list of cliques so the same list is given
+    to all implementations instead of the cliques of igraph
+    """
+    cliques = set()
+    for vertex in range(graph.nb_vertices):
+        clique = [vertex]
+        for neighbor in sorted(
+            graph.neighborhood[vertex], key=lambda v: (-graph.weights[v], v)
+        ):
+            if all(graph.adjacency_matrix[neighbor][v] for v in clique):
+                clique.append(neighbor)
+        if len(clique) >= 3:
+            cliques.add(tuple(sorted(clique)))
+    return [list(clique) for clique in sorted(cliques)]
+
+
+def _write_cliques(graph: Graph, cliques_file: str) -> None:
+    with open(cliques_file, "w", encoding="utf8") as file:
+        for clique in greedy_cliques(graph):
+            file.write(" ".join(map(str, clique)) + "\n")
+
+
+def _read_files(output_file_base: str) -> Dict[str, str]:
+    """Content of the files of the output, by file name"""
+    files = {}
+    for file_name in sorted(glob(f"{output_file_base}.*")):
+        with open(file_name, "r", encoding="utf8") as file:
+            files[os.path.basename(file_name)] = file.read()
+    return files
+
+
+def _graph_state(graph: Graph, output_file_base: str) -> Dict[str, Any]:
+    """State of the graph after a reduction and the files of the conversion,
+    called with _call as an inconsistent graph makes convert_to_nodes fail"""
+    Graph.convert_to_nodes(graph, output_file_base, only_conv_ed_w=True)
+    return {
+        "neighborhood": [sorted(neighbors) for neighbors in graph.neighborhood],
+        "reduced_vertices": sorted(graph.reduced_vertices),
+        "second_reduction": sorted(graph.second_reduction.items()),
+        "files": _read_files(output_file_base),
+    }
+
+
+def _call(implementation: Callable, *args) -> Tuple[Any, float]:
+    """Call the implementation, exceptions are part of the output"""
+    start = time.perf_counter()
+    try:
+        result = implementation(*args)
+    except Exception as error:  # pylint: disable=broad-except
+        result = ("exception", type(error).__name__, str(error))
+    return result, time.perf_counter() - start
+
+
+def run_target(
+    target: str, implementation: Callable, case: Case, directory: str
+) -> Tuple[Dict[str, Any], float]:
+    """Run the implementation of the target on the case
+
+    :param target: reduction_1, reduction_2, convert_to_nodes or Solution
+    :type target: str
+    :param implementation: implementation to run
+    :type implementation: Callable
+    :param case: the weighted graph
+    :type case: Case
+    :param directory: empty directory for the files of the implementation
+    :type directory: str
+    :return: outputs to compare (by name), time of the implementation
+    :rtype: Tuple[Dict[str, Any], float]
+    """
+    base = f"{directory}/case"
+    graph = build_graph(case)
+    if target in ("reduction_1", "reduction_2"):
+        _write_cliques(graph, f"{directory}/cliques")
+        if target == "reduction_1":
+            result, duration = _call(implementation, graph, f"{directory}/cliques")
+        else:
+            # reduction_2 runs after the reference reduction_1
+            Graph.reduction_1(graph, f"{directory}/cliques")
+            result, duration = _call(implementation, graph)
+        state, _ = _call(_graph_state, graph, base)
+        return {"return": result, "graph": state}, duration
+    _write_cliques(graph, f"{directory}/cliques")
+    Graph.reduction_1(graph, f"{directory}/cliques")
+    Graph.reduction_2(graph)
+    if target == "convert_to_nodes":
+        result_conv, duration_conv = _call(implementation, graph, base, True)
+        result_col, duration_col = _call(implementation, graph, f"{base}_col", False)
+        return (
+            {
+                "return (only_conv_ed_w=True)": result_conv,
+                "return (only_conv_ed_w=False)": result_col,
+                "files": {**_read_files(base), **_read_files(f"{base}_col")},
+            },
+            duration_conv + duration_col,
+        )
+    # Solution : convert a greedy coloring of the reduced graph
+    Graph.convert_to_nodes(graph, base, True)
+    reduced = load_graph(f"{base}.edgelist", f"{base}.col.w")
+    colors: List[int] = [-1] * reduced.nb_vertices
+    for vertex in range(reduced.nb_vertices):
+        used = {colors[neighbor] for neighbor in reduced.neighborhood[vertex]}
+        colors[vertex] = min(set(range(len(used) + 1)) - used)
+    if not colors:
+        return {}, 0.0
+    conversion = load_conversion(f"{base}.conv")
+    solution, duration = _call(
+        implementation, build_graph(case), colors, copy.deepcopy(conversion)
+    )
+    outputs, _ = _call(
+        lambda: {
+            "colors": list(solution.colors),
+            "current_score": solution.current_score,
+        }
+    )
+    return {"Solution": outputs}, duration
+
+
+def _shorten(value: Any, size: int = 80) -> str:
+    text = repr(value)
+    return text if len(text) <= size else f"{text[:size]}..."
+
+
+def difference(reference: Any, result: Any, path: str = "") -> Optional[str]:
+    """First component of the outputs which differs
+
+    :param reference: outputs of the reference
+    :type reference: Any
+    :param result: outputs of the implementation
+    :type result: Any
+    :param path: name of the compared component, defaults to ""
+    :type path: str
+    :return: None if the outputs are the same, else the name of the component
+             (file name for the files) and the two values
+    :rtype: Optional[str]
+    """
+    if reference == result:
+        return None
+    if isinstance(reference, dict) and isinstance(result, dict):
+        for key in list(reference) + [key for key in result if key not in reference]:
+            name = f"{path} {key}" if path else str(key)
+            if key not in result:
+                return f"{name} : missing"
+            if key not in reference:
+                return f"{name} : unexpected"
+            found = difference(reference[key], result[key], name)
+            if found:
+                return found
+    if isinstance(reference, str) and isinstance(result, str):
+        # content of a file : first different line
+        reference_lines = reference.splitlines()
+        result_lines = result.splitlines()
+        for line, (expected, found) in enumerate(zip(reference_lines, result_lines)):
+            if expected != found:
+                return f"{path} line {line + 1} : {expected!r} != {found!r}"
+        return f"{path} : {len(reference_lines)} lines != {len(result_lines)} lines"
+    return f"{path} : {_shorten(reference)} != {_shorten(result)}"
+
+
+def compare(
+    target: str, implementation: Callable, case: Case
+) -> Tuple[Optional[str], float, float]:
+    """Compare the implementation with the reference on the case
+
+    :return: first difference (None if the outputs are the same, see difference),
+             time of the reference, time of the implementation
+    :rtype: Tuple[Optional[str], float, float]
+    """
+    with tempfile.TemporaryDirectory() as reference_directory:
+        reference, reference_time = run_target(
+            target, REFERENCES[target], case, reference_directory
+        )
+    with tempfile.TemporaryDirectory() as directory:
+        result, duration = run_target(target, implementation, case, directory)
+    return difference(reference, result), reference_time, duration
+
+
+def _remove_vertices(case: Case, vertices: range) -> Case:
+    weights, edges = case
+    numbers = [
+        -1 if vertex in vertices else vertex - len(vertices) * (vertex > vertices[0])
+        for vertex in range(len(weights))
+    ]
+    return (
+        [weight for vertex, weight in enumerate(weights) if numbers[vertex] != -1],
+        [
+            (numbers[vertex1], numbers[vertex2])
+            for vertex1, vertex2 in edges
+            if numbers[vertex1] != -1 and numbers[vertex2] != -1
+        ],
+    )
+
+
+def _remove_edges(case: Case, edges: range) -> Case:
+    return case[0], case[1][: edges.start] + case[1][edges.stop :]
+
+
+def _lower_weights(case: Case, fails: Callable[[Case], bool]) -> Case:
+    weights, edges = case
+    for vertex in range(len(weights)):
+        for weight in (1, weights[vertex] // 2, weights[vertex] - 1):
+            if 1 <= weight < weights[vertex]:
+                smaller = (weights[:vertex] + [weight] + weights[vertex + 1 :], edges)
+                if fails(smaller):
+                    return smaller
+    return case
+
+
+def shrink_case(case: Case, fails: Callable[[Case], bool]) -> Case:
+    """Remove blocks of vertices then of edges (halving the size of the blocks)
+    while the case still fails, then lower the weights and start again
+
+    :param case: failing case
+    :type case: Case
+    :param fails: True if the case still fails
+    :type fails: Callable[[Case], bool]
+    :return: a failing case where no vertex or edge can be removed
+             and no weight can be lowered
+    :rtype: Case
+    """
+    changed = True
+    while changed:
+        changed = False
+        for remove, size in ((_remove_vertices, 0), (_remove_edges, 1)):
+            block = max(len(case[size]) // 2, 1)
+            while block >= 1:
+                start = len(case[size]) - block
+                while start >= 0:
+                    smaller = remove(case, range(start, start + block))
+                    if fails(smaller):
+                        case = smaller
+                        changed = True
+                    start = min(start, len(case[size])) - block
+                block //= 2
+        if not changed:
+            smaller = _lower_weights(case, fails)
+            changed = smaller is not case
+            case = smaller
+    return case
+
+
+def _canonical_case(case: Case, max_vertices: int = 7) -> Tuple:
+    """Same key for the cases which only differ by the numbers of the vertices
+    (only for the small cases, the order of the vertices is kept otherwise)"""
+    weights, edges = case
+    orders = (
+        itertools.permutations(range(len(weights)))
+        if len(weights) <= max_vertices
+        else [range(len(weights))]
+    )
+    keys = []
+    for order in orders:
+        numbers = {vertex: number for number, vertex in enumerate(order)}
+        keys.append(
+            (
+                tuple(weights[vertex] for vertex in order),
+                tuple(
+                    sorted(
+                        tuple(sorted((numbers[vertex1], numbers[vertex2])))
+                        for vertex1, vertex2 in edges
+                    )
+                ),
+            )
+        )
+    return min(keys)
+
+
+def check_implementation(
+    target: str, implementation: Callable, cases: List[Case]
+) -> Tuple[List[Tuple[Case, str]], float]:
+    """Compare the implementation with the reference on all cases
+
+    :param target: reduction_1, reduction_2, convert_to_nodes or Solution
+    :type target: str
+    :param implementation: implementation to check
+    :type implementation: Callable
+    :param cases: cases to compare
+    :type cases: List[Case]
+    :return: minimal failing cases (without duplicates) with their first
+             difference, speed ratio (reference time / implementation time)
+    :rtype: Tuple[List[Tuple[Case, str]], float]
+    """
+    failures: List[Tuple[Case, str]] = []
+    known = set()
+    reference_time = 0.0
+    implementation_time = 0.0
+    for case in cases:
+        different, case_reference_time, case_time = compare(
+            target, implementation, case
+        )
+        reference_time += case_reference_time
+        implementation_time += case_time
+        if different:
+            case = shrink_case(
+                case,
+                lambda smaller: compare(target, implementation, smaller)[0] is not None,
+            )
+            key = _canonical_case(case)
+            if key not in known:
+                known.add(key)
+                different = compare(target, implementation, case)[0]
+                failures.append((case, str(different)))
+    if not implementation_time:
+        return failures, 0.0
+    return failures, reference_time / implementation_time
+
+
+def check_all(
+    nb_random_cases: int = 200,
+    path_to_instance_rep: Optional[str] = ".",
+    max_vertices: int = 250,
+    seed: int = 0,
+) -> Dict[Tuple[str, str], Tuple[List[Case], float]]:
+    """Compare all registered implementations with the references
+    on random graphs and on the bundled instances
+
+    :param nb_random_cases: number of random graphs, defaults to 200
+    :type nb_random_cases: int
+    :param path_to_instance_rep: path to the repository of instances,
+                                 None to only use random graphs, defaults to "."
+    :type path_to_instance_rep: Optional[str]
+    :param max_vertices: max number of vertices of the bundled instances
+    :type max_vertices: int
+    :param seed: seed of the random graphs, defaults to 0
+    :type seed: int
+    :return: minimal failing cases with their first difference
+             and speed ratio of each (target, name)
+    :rtype: Dict[Tuple[str, str], Tuple[List[Tuple[Case, str]], float]]
+    """
+    cases = random_cases(nb_random_cases, seed=seed)
+    if path_to_instance_rep is not None:
+        cases += bundled_cases(path_to_instance_rep, max_vertices)
+    results = {}
+    for target, implementations in ALTERNATIVES.items():
+        for name, implementation in implementations.items():
+            failures, ratio = check_implementation(target, implementation, cases)
+            results[(target, name)] = (failures, ratio)
+            print(
+                f"{target} {name} : {len(failures)} different failures "
+                f"on {len(cases)} cases, speed ratio {ratio:.2f}"
+            )
+            for (weights, edges), different in failures:
+                print(f"    weights={weights} edges={edges}")
+                print(f"        {different}")
+    return results
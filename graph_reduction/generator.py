@@ -0,0 +1,258 @@
+"""
+Generate large weighted graphs similar to the instances of the repository
+"""
+from typing import Iterator, List, Tuple, Dict
+import math
+import os
+import random
+
+# Range of the weights of each family and variant of the instances
+# (weights of the original instances, g and gb variants)
+WEIGHT_RANGES: Dict[str, Dict[str, Tuple[int, int]]] = {
+    "random": {"": (1, 19), "g": (1, 5), "gb": (1, 20)},
+    "geometric": {"": (1, 10), "g": (1, 5), "gb": (1, 20)},
+    "clustered": {"": (1, 19), "g": (1, 5), "gb": (1, 20)},
+}
+
+FAMILIES = tuple(WEIGHT_RANGES)
+
+# Probability of the edges inside the blocks of the clustered graphs
+CLUSTER_DENSITY = 0.9
+
+
+def random_edges(
+    nb_vertices: int, density: float, rng: random.Random
+) -> Iterator[Tuple[int, int]]:
+    """Edges of a G(n,p) graph (as DSJC and C instances)
+
+    The edges are drawn by skipping the pairs of vertices with a geometric
+    distribution (Batagelj and Brandes) so the generation takes O(n + m)
+    instead of O(n^2).
+
+    :param nb_vertices: number of vertices
+    :type nb_vertices: int
+    :param density: probability of each edge
+    :type density: float
+    :param rng: random generator
+    :type rng: random.Random
+    :return: edges (vertex1, vertex2) with vertex1 < vertex2
+    :rtype: Iterator[Tuple[int, int]]
+    """
+    if density <= 0:
+        return
+    if density >= 1:
+        for vertex2 in range(nb_vertices):
+            for vertex1 in range(vertex2):
+                yield vertex1, vertex2
+        return
+    log_q = math.log(1 - density)
+    vertex2 = 1
+    vertex1 = -1
+    while vertex2 < nb_vertices:
+        vertex1 += 1 + int(math.log(1 - rng.random()) / log_q)
+        while vertex1 >= vertex2 and vertex2 < nb_vertices:
+            vertex1 -= vertex2
+            vertex2 += 1
+        if vertex2 < nb_vertices:
+            yield vertex1, vertex2
+
+
+def geometric_density(radius: float) -> float:
+    """Density of a random geometric graph in the unit square : probability
+    that the distance between two random points is lower than the radius
+
+    :param radius: max distance between two neighbors
+    :type radius: float
+    :return: expected density of the graph
+    :rtype: float
+    """
+    if radius <= 0:
+        return 0.0
+    if radius >= math.sqrt(2):
+        return 1.0
+    if radius <= 1:
+        return math.pi * radius**2 - 8 / 3 * radius**3 + radius**4 / 2
+    return (
+        1 / 3
+        + (math.pi - 2) * radius**2
+        - radius**4 / 2
+        + 4 / 3 * (2 * radius**2 + 1) * math.sqrt(radius**2 - 1)
+        - 4 * radius**2 * math.acos(1 / radius)
+    )
+
+
+def geometric_radius(density: float) -> float:
+    """Radius giving a random geometric graph of the density
+    (inverse of geometric_density, computed by bisection)
+
+    :param density: expected density of the graph
+    :type density: float
+    :return: max distance between two neighbors
+    :rtype: float
+    """
+    low, high = 0.0, math.sqrt(2)
+    for _ in range(60):
+        middle = (low + high) / 2
+        if geometric_density(middle) < density:
+            low = middle
+        else:
+            high = middle
+    return high
+
+
+def geometric_edges(
+    nb_vertices: int, density: float, rng: random.Random
+) -> Iterator[Tuple[int, int]]:
+    """Edges of a random geometric graph (as DSJR and GEOM instances)
+
+    The vertices are points in the unit square, two vertices are neighbors
+    if their distance is lower than the radius. As the disk of the points near
+    the borders is cut by the square, the radius is not sqrt(density / pi) but
+    is computed with the exact density of the unit square (see geometric_radius).
+    The points are sorted in a grid of cells of the size of the radius so only
+    the points of the neighbor cells are compared.
+
+    :param nb_vertices: number of vertices
+    :type nb_vertices: int
+    :param density: expected density of the graph
+    :type density: float
+    :param rng: random generator
+    :type rng: random.Random
+    :return: edges (vertex1, vertex2) with vertex1 < vertex2
+    :rtype: Iterator[Tuple[int, int]]
+    """
+    if density <= 0:
+        return
+    radius = geometric_radius(density)
+    points = [(rng.random(), rng.random()) for _ in range(nb_vertices)]
+    nb_cells = max(1, int(1 / radius))
+    cells: Dict[Tuple[int, int], List[int]] = {}
+    points_cells = [
+        (min(int(x * nb_cells), nb_cells - 1), min(int(y * nb_cells), nb_cells - 1))
+        for x, y in points
+    ]
+    for vertex, cell in enumerate(points_cells):
+        cells.setdefault(cell, []).append(vertex)
+    radius_2 = radius * radius
+    for vertex1, (x, y) in enumerate(points):
+        cell_x, cell_y = points_cells[vertex1]
+        for neighbor_x in range(max(cell_x - 1, 0), min(cell_x + 2, nb_cells)):
+            for neighbor_y in range(max(cell_y - 1, 0), min(cell_y + 2, nb_cells)):
+                for vertex2 in cells.get((neighbor_x, neighbor_y), []):
+                    if vertex1 < vertex2:
+                        x2, y2 = points[vertex2]
+                        if (x - x2) ** 2 + (y - y2) ** 2 < radius_2:
+                            yield vertex1, vertex2
+
+
+def clustered_edges(
+    nb_vertices: int, density: float, rng: random.Random
+) -> Iterator[Tuple[int, int]]:
+    """Edges of a graph made of dense blocks (as the large cliques of the wap
+    and zeroin instances, the other structures of these instances are not
+    reproduced)
+
+    The vertices are split in blocks of consecutive vertices, the edges inside
+    the blocks have a probability of CLUSTER_DENSITY and the blocks are linked
+    by a G(n,p) graph. The size of the blocks is chosen so half of the edges
+    are inside the blocks.
+
+    :param nb_vertices: number of vertices
+    :type nb_vertices: int
+    :param density: density of the graph
+    :type density: float
+    :param rng: random generator
+    :type rng: random.Random
+    :return: edges (vertex1, vertex2) with vertex1 < vertex2
+    :rtype: Iterator[Tuple[int, int]]
+    """
+    if density <= 0 or nb_vertices < 2:
+        return
+    block_size = int(density * (nb_vertices - 1) / (2 * CLUSTER_DENSITY)) + 1
+    block_size = min(nb_vertices, max(2, block_size))
+    for start in range(0, nb_vertices, block_size):
+        size = min(block_size, nb_vertices - start)
+        for vertex1, vertex2 in random_edges(size, CLUSTER_DENSITY, rng):
+            yield start + vertex1, start + vertex2
+    inside = (block_size - 1) / (nb_vertices - 1)
+    if inside >= 1:
+        return
+    outside_density = min(1.0, density / 2 / (1 - inside))
+    for vertex1, vertex2 in random_edges(nb_vertices, outside_density, rng):
+        if vertex1 // block_size != vertex2 // block_size:
+            yield vertex1, vertex2
+
+
+def generate_weights(
+    nb_vertices: int, family: str, variant: str, rng: random.Random
+) -> List[int]:
+    """Draw the weights uniformly in the range of the family and variant
+
+    :param nb_vertices: number of vertices
+    :type nb_vertices: int
+    :param family: random, geometric or clustered
+    :type family: str
+    :param variant: "" (weights of the original instances), "g" or "gb"
+    :type variant: str
+    :param rng: random generator
+    :type rng: random.Random
+    :return: weights of the vertices
+    :rtype: List[int]
+    """
+    low, high = WEIGHT_RANGES[family][variant]
+    return [rng.randint(low, high) for _ in range(nb_vertices)]
+
+
+def instance_name(family: str, nb_vertices: int, density: float, variant: str) -> str:
+    """Name of a generated instance, as DSJC125.1g : family, size, density, variant"""
+    return f"{family}{nb_vertices}_{density:g}{variant}"
+
+
+def generate_instance(
+    output_directory: str,
+    family: str,
+    nb_vertices: int,
+    density: float,
+    variant: str = "",
+    seed: int = 0,
+) -> Tuple[str, int]:
+    """Generate an instance and save it in edgelist and col.w files
+
+    The edges are written while they are generated so the memory only depends
+    on the number of vertices.
+
+    :param output_directory: directory of the files (created if needed)
+    :type output_directory: str
+    :param family: random (G(n,p)), geometric or clustered
+    :type family: str
+    :param nb_vertices: number of vertices
+    :type nb_vertices: int
+    :param density: density of the graph
+    :type density: float
+    :param variant: weights of the original instances of the family (""),
+                    "g" or "gb", defaults to ""
+    :type variant: str
+    :param seed: seed of the random generator, defaults to 0
+    :type seed: int
+    :return: name of the instance, number of edges
+    :rtype: Tuple[str, int]
+    """
+    assert family in FAMILIES, f"unknown family {family}"
+    assert variant in WEIGHT_RANGES[family], f"unknown variant {variant}"
+    rng = random.Random(seed)
+    name = instance_name(family, nb_vertices, density, variant)
+    os.makedirs(output_directory, exist_ok=True)
+    edges = {
+        "random": random_edges,
+        "geometric": geometric_edges,
+        "clustered": clustered_edges,
+    }[family]
+    nb_edges = 0
+    with open(f"{output_directory}/{name}.edgelist", "w", encoding="utf8") as file:
+        for vertex1, vertex2 in edges(nb_vertices, density, rng):
+            file.write(f"{vertex1} {vertex2}\n")
+            nb_edges += 1
+    with open(f"{output_directory}/{name}.col.w", "w", encoding="utf8") as file:
+        for weight in generate_weights(nb_vertices, family, variant, rng):
+            file.write(f"{weight}\n")
+    return name, nb_edges
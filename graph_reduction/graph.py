@@ -1,10 +1,21 @@
 """
 Representation of node and Graph
 """
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional, Iterator
+from array import array
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory, util
 
 from dataclasses import dataclass
 
+try:
+    import fcntl
+except ImportError:  # Windows frees shared memory with its last handle
+    fcntl = None
+
 
 @dataclass
 class Node:
@@ -339,3 +350,355 @@ def write_to_file(table: str, file: str) -> None:
     with open(file, "w", encoding="utf8") as file_:
         for line in table:
             file_.write(line)
+
+
+# Layout of the header of a shared graph (int64 values)
+_HEADER_FIELDS = (
+    "refcount",
+    "nb_vertices",
+    "nb_indices",
+    "nb_different",
+    "nb_greedy",
+    "nb_same",
+    "name_size",
+)
+_HEADER_SIZE = len(_HEADER_FIELDS)
+_ITEM_SIZE = 8
+# shared_memory.SharedMemory gets a track argument in Python 3.13
+_HAS_TRACK = sys.version_info >= (3, 13)
+
+
+class _Neighborhood:
+    """Read-only list of neighbors of each vertex, backed by CSR arrays"""
+
+    def __init__(self, offsets: memoryview, indices: memoryview):
+        self._offsets = offsets
+        self._indices = indices
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, vertex: int) -> List[int]:
+        # a copy, so no view on the segment is kept by the caller
+        return self._indices[self._offsets[vertex] : self._offsets[vertex + 1]].tolist()
+
+    def __iter__(self) -> Iterator[List[int]]:
+        for vertex in range(len(self)):
+            yield self[vertex]
+
+
+class SharedGraph:
+    """Read-only graph stored in shared memory to be used by several processes
+
+    The graph is saved in CSR format (weights, offsets and indices) followed by
+    the conversion structures (d, g and s lines of a conversion file).
+    The segment is reference counted and removed when the last handle is
+    released. An attached handle is released by close(), when it is garbage
+    collected or when its process exits. The handle of the process which
+    published the graph is only released by close() or when the process exits,
+    so other processes can still attach to the graph after the handle is
+    dropped.
+    The handle provides the attributes used by Solution
+    (name, nb_vertices, weights and neighborhood) without copying the arrays.
+    Pickling a handle (to give it to another process) attaches to the segment.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, creator: bool = False):
+        self._shm: Optional[shared_memory.SharedMemory] = shm
+        self._views: List[memoryview] = self._map_views(shm.buf)
+        # released at exit (multiprocessing runs these finalizers in the pool
+        # workers too) and, for the attached handles, when garbage collected
+        self._finalizer = util.Finalize(
+            None if creator else self,
+            _release_segment,
+            args=(shm, self._views, True),
+            exitpriority=10,
+        )
+
+    def _map_views(self, base: memoryview) -> List[memoryview]:
+        """Create the views of the handle on the segment
+
+        :param base: view on the whole segment
+        :type base: memoryview
+        :return: all the views created on the segment (base included)
+        :rtype: List[memoryview]
+        """
+        buffer = base.cast("q")
+        header = buffer[:_HEADER_SIZE]
+        (
+            _,
+            nb_vertices,
+            nb_indices,
+            nb_different,
+            nb_greedy,
+            nb_same,
+            name_size,
+        ) = header.tolist()
+        header.release()
+        self.nb_vertices: int = nb_vertices
+        position = _HEADER_SIZE
+        self.weights: memoryview = buffer[position : position + nb_vertices]
+        position += nb_vertices
+        self._offsets: memoryview = buffer[position : position + nb_vertices + 1]
+        position += nb_vertices + 1
+        self._indices: memoryview = buffer[position : position + nb_indices]
+        position += nb_indices
+        self._different: memoryview = buffer[position : position + 2 * nb_different]
+        position += 2 * nb_different
+        self._greedy: memoryview = buffer[position : position + nb_greedy]
+        position += nb_greedy
+        self._same: memoryview = buffer[position : position + 2 * nb_same]
+        position += 2 * nb_same
+        start = position * _ITEM_SIZE
+        name = base[start : start + name_size]
+        self.name: str = bytes(name).decode("utf8")
+        name.release()
+        self.neighborhood = _Neighborhood(self._offsets, self._indices)
+        return [
+            self.weights,
+            self._offsets,
+            self._indices,
+            self._different,
+            self._greedy,
+            self._same,
+            buffer,
+            base,
+        ]
+
+    @property
+    def shm_name(self) -> str:
+        """Name of the shared memory segment, used to attach to the graph"""
+        assert self._shm is not None, "shared graph already closed"
+        return self._shm.name
+
+    @property
+    def conversion(
+        self,
+    ) -> Optional[Tuple[Dict[int, int], List[int], Dict[int, int]]]:
+        """Conversion structures (as returned by load_conversion) or None if
+        the graph was shared without conversion
+
+        :return: different_number, greedy and same_color structures
+        :rtype: Optional[Tuple[Dict[int, int], List[int], Dict[int, int]]]
+        """
+        if not self._different and not self._greedy and not self._same:
+            return None
+        different = self._different.tolist()
+        same = self._same.tolist()
+        return (
+            dict(zip(different[::2], different[1::2])),
+            self._greedy.tolist(),
+            dict(zip(same[::2], same[1::2])),
+        )
+
+    def close(self) -> None:
+        """Release the handle, the last handle removes the shared segment
+
+        :raises BufferError: if views on the segment (as slices of weights)
+                             are still used, the handle stays usable and close
+                             can be called again once they are released
+        """
+        if self._shm is None:
+            return
+        try:
+            _release_segment(self._shm, self._views, False)
+        except BufferError:
+            # the mapping is still open, the released views are created again
+            self._views[:] = self._map_views(
+                memoryview(self._shm._mmap)  # pylint: disable=protected-access
+            )
+            raise
+        self._finalizer.cancel()
+        self._shm = None
+
+    def __enter__(self) -> "SharedGraph":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __reduce__(self):
+        return attach_graph, (self.shm_name,)
+
+    def __repr__(self):
+        return f"SharedGraph(name={self.name}, nb_vertices={self.nb_vertices})"
+
+
+def share_graph(
+    graph: Graph,
+    conversion: Optional[Tuple[Dict[int, int], List[int], Dict[int, int]]] = None,
+    shm_name: Optional[str] = None,
+) -> SharedGraph:
+    """Publish the graph (and its conversion) in shared memory
+
+    :param graph: graph to share
+    :type graph: Graph
+    :param conversion: conversion structures (from load_conversion), defaults to None
+    :type conversion: Optional[Tuple[Dict[int, int], List[int], Dict[int, int]]]
+    :param shm_name: name of the segment, defaults to None (random name)
+    :type shm_name: Optional[str]
+    :return: handle on the shared graph (released by close or at exit)
+    :rtype: SharedGraph
+    """
+    different_number, greedy, same_color = conversion if conversion else ({}, [], {})
+    offsets: List[int] = [0]
+    for vertex in range(graph.nb_vertices):
+        offsets.append(offsets[-1] + len(graph.neighborhood[vertex]))
+    name = graph.name.encode("utf8")
+    header = [
+        1,
+        graph.nb_vertices,
+        offsets[-1],
+        len(different_number),
+        len(greedy),
+        len(same_color),
+        len(name),
+    ]
+    nb_items = (
+        _HEADER_SIZE
+        + graph.nb_vertices
+        + len(offsets)
+        + offsets[-1]
+        + 2 * len(different_number)
+        + len(greedy)
+        + 2 * len(same_color)
+    )
+    # the name is padded to keep the whole segment readable as int64 values
+    size = (nb_items + len(name) // _ITEM_SIZE + 1) * _ITEM_SIZE
+    if _HAS_TRACK:
+        shm = shared_memory.SharedMemory(
+            name=shm_name, create=True, size=size, track=False
+        )
+    else:
+        shm = shared_memory.SharedMemory(name=shm_name, create=True, size=size)
+        _untrack(shm)
+    buffer = shm.buf.cast("q")
+    position = 0
+    for values in (
+        header,
+        graph.weights,
+        offsets,
+        [neighbor for neighbors in graph.neighborhood for neighbor in neighbors],
+        [number for item in different_number.items() for number in item],
+        greedy,
+        [number for item in same_color.items() for number in item],
+    ):
+        buffer[position : position + len(values)] = array("q", values)
+        position += len(values)
+    buffer.release()
+    start = nb_items * _ITEM_SIZE
+    shm.buf[start : start + len(name)] = name
+    return SharedGraph(shm, creator=True)
+
+
+def attach_graph(shm_name: str) -> SharedGraph:
+    """Attach to a graph published with share_graph
+
+    :param shm_name: name of the shared memory segment
+    :type shm_name: str
+    :return: handle on the shared graph (released by close or at exit)
+    :rtype: SharedGraph
+    """
+    with _segment_lock(shm_name):
+        try:
+            shm = _open_segment(shm_name)
+        except FileNotFoundError:
+            _remove_lock_file(shm_name)
+            raise
+        buffer = shm.buf.cast("q")
+        if buffer[0] == 0:
+            buffer.release()
+            shm.close()
+            _remove_lock_file(shm_name)
+            raise FileNotFoundError(f"shared graph {shm_name} already released")
+        buffer[0] += 1
+        buffer.release()
+    return SharedGraph(shm)
+
+
+def _open_segment(shm_name: str) -> shared_memory.SharedMemory:
+    if _HAS_TRACK:
+        return shared_memory.SharedMemory(name=shm_name, track=False)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _untrack(shm)
+    return shm
+
+
+def _release_segment(
+    shm: shared_memory.SharedMemory, views: List[memoryview], finalizing: bool
+) -> None:
+    """Close the mapping of a handle and decrement the reference counter,
+    remove the segment if it was the last handle
+
+    :param shm: the segment of the handle
+    :type shm: shared_memory.SharedMemory
+    :param views: views of the handle on the segment
+    :type views: List[memoryview]
+    :param finalizing: called by the finalizer, the counter is decremented
+                       even if the mapping can't be closed
+    :type finalizing: bool
+    """
+    name = shm.name
+    for view in views:
+        view.release()
+    try:
+        shm.close()
+    except BufferError:
+        if not finalizing:
+            raise
+    # the mapping of the handle is closed, the counter is updated with a new one
+    with _segment_lock(name):
+        try:
+            counter = _open_segment(name)
+        except FileNotFoundError:
+            # removed by another process
+            _remove_lock_file(name)
+            return
+        buffer = counter.buf.cast("q")
+        buffer[0] -= 1
+        last = buffer[0] <= 0
+        buffer.release()
+        if last:
+            _unlink(counter)
+        counter.close()
+        if last:
+            _remove_lock_file(name)
+
+
+def _lock_file(shm_name: str) -> str:
+    return os.path.join(tempfile.gettempdir(), f"{shm_name.lstrip('/')}.lock")
+
+
+@contextmanager
+def _segment_lock(shm_name: str):
+    """Lock between processes to update the reference counter of the segment"""
+    if fcntl is None:
+        yield
+        return
+    with open(_lock_file(shm_name), "a", encoding="utf8") as file:
+        fcntl.flock(file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(file, fcntl.LOCK_UN)
+
+
+def _remove_lock_file(shm_name: str) -> None:
+    if fcntl is not None and os.path.exists(_lock_file(shm_name)):
+        os.remove(_lock_file(shm_name))
+
+
+def _untrack(shm: shared_memory.SharedMemory) -> None:
+    """The resource tracker would remove the segment when the first process
+    exits, the reference counter is in charge of it instead"""
+    if os.name == "posix":
+        resource_tracker.unregister(shm._name, "shared_memory")
+
+
+def _unlink(shm: shared_memory.SharedMemory) -> None:
+    if os.name != "posix":
+        return
+    if not _HAS_TRACK:
+        # unlink() unregisters the segment from the resource tracker
+        resource_tracker.register(shm._name, "shared_memory")
+    shm.unlink()
@@ -0,0 +1,396 @@
+"""
+Check that the reduced instances and the conversion files are consistent
+with the original instances
+"""
+from typing import List, Tuple, Dict, Optional, Set
+import csv
+import hashlib
+import json
+import multiprocessing
+import os
+from contextlib import contextmanager
+from glob import glob
+
+# Default file storing the hash of the files of each verified instance
+CACHE_FILE = ".verification_cache.json"
+
+# Instances with files missing from the repository (too large)
+KNOWN_INCOMPLETE = ("C2000.5", "C2000.9", "DSJC1000.9")
+
+
+def conversion_steps(path_to_instance_rep: str, instance: str) -> List[str]:
+    """List the bases of the conversion files of the instance in reduction order
+
+    :param path_to_instance_rep: path to the repository of instances
+    :type path_to_instance_rep: str
+    :param instance: name of the instance
+    :type instance: str
+    :return: conversion/{instance}_{k} for each reduction step k
+    :rtype: List[str]
+    """
+    return sorted(
+        [
+            conv_file[: -len(".conv")]
+            for conv_file in glob(
+                f"{path_to_instance_rep}/conversion/{instance}_*.conv"
+            )
+            if conv_file.rsplit("_", 1)[1].split(".")[0].isdigit()
+        ],
+        key=lambda f: int(f.rsplit("_", 1)[1]),
+    )
+
+
+def instance_files(path_to_instance_rep: str, instance: str) -> List[str]:
+    """List all files describing the instance and its reduction
+
+    :param path_to_instance_rep: path to the repository of instances
+    :type path_to_instance_rep: str
+    :param instance: name of the instance
+    :type instance: str
+    :return: original files, conversion files and reduced files
+    :rtype: List[str]
+    """
+    files = [
+        f"{path_to_instance_rep}/wvcp_original/{instance}.edgelist",
+        f"{path_to_instance_rep}/wvcp_original/{instance}.col.w",
+    ]
+    for step in conversion_steps(path_to_instance_rep, instance):
+        files += [f"{step}.conv", f"{step}.edgelist", f"{step}.col.w"]
+    files += [
+        f"{path_to_instance_rep}/wvcp_reduced/{instance}{extension}"
+        for extension in (".edgelist", ".col.w", ".col", ".wcol")
+    ]
+    return files
+
+
+@contextmanager
+def _parsing(file_name: str):
+    """Add the name of the file to the errors raised while parsing it"""
+    try:
+        yield
+    except (ValueError, IndexError) as error:
+        raise ValueError(f"{file_name} : {error}") from error
+
+
+def load_weights(weights_file: str) -> List[int]:
+    """Load the weights of a col.w file"""
+    with open(weights_file, "r", encoding="utf8") as file, _parsing(weights_file):
+        return [int(line) for line in file]
+
+
+def load_edges(edges_file: str, nb_vertices: int) -> Set[int]:
+    """Load an edgelist file as a set of edges, each edge (u, v) with u < v is
+    encoded by u * nb_vertices + v so edge sets can be compared as sets of int
+    """
+    edges: Set[int] = set()
+    with open(edges_file, "r", encoding="utf8") as file, _parsing(edges_file):
+        for number, line in enumerate(file, 1):
+            vertex1, vertex2 = sorted(map(int, line.split()))
+            if vertex1 < 0 or vertex2 >= nb_vertices:
+                raise ValueError(f"line {number}, vertex out of [0, {nb_vertices}[")
+            edges.add(vertex1 * nb_vertices + vertex2)
+    return edges
+
+
+def load_dimacs(
+    dimacs_file: str, nb_vertices: int
+) -> Tuple[int, int, Set[int], Dict[int, int]]:
+    """Load a col or wcol file (numbers from 1)
+
+    :return: number of vertices and edges announced,
+             edges (encoded as in load_edges), weights of the v lines
+    :rtype: Tuple[int, int, Set[int], Dict[int, int]]
+    """
+    nb_vertices_p = -1
+    nb_edges = -1
+    edges: Set[int] = set()
+    weights: Dict[int, int] = {}
+    with open(dimacs_file, "r", encoding="utf8") as file, _parsing(dimacs_file):
+        for line in file:
+            if line[0] == "p":
+                nb_vertices_p, nb_edges = map(int, line.split()[2:])
+            elif line[0] == "e":
+                _, vertex1, vertex2 = line.split()
+                vertex1, vertex2 = sorted((int(vertex1) - 1, int(vertex2) - 1))
+                edges.add(vertex1 * nb_vertices + vertex2)
+            elif line[0] == "v":
+                _, vertex, weight = line.split()
+                weights[int(vertex) - 1] = int(weight)
+    return nb_vertices_p, nb_edges, edges, weights
+
+
+def load_conversion_lines(
+    conv_file: str,
+) -> Tuple[List[Tuple[int, int]], List[int], List[Tuple[int, int]]]:
+    """Load the d, g and s lines of a conversion file, keeping duplicates"""
+    different_number: List[Tuple[int, int]] = []
+    greedy: List[int] = []
+    same_color: List[Tuple[int, int]] = []
+    with open(conv_file, "r", encoding="utf8") as file, _parsing(conv_file):
+        for line in file:
+            if line[0] == "d":
+                _, number1, number2 = line.split()
+                different_number.append((int(number1), int(number2)))
+            elif line[0] == "g":
+                _, number = line.split()
+                greedy.append(int(number))
+            elif line[0] == "s":
+                _, number1, number2 = line.split()
+                same_color.append((int(number1), int(number2)))
+    return different_number, greedy, same_color
+
+
+def neighborhoods(edges: Set[int], nb_vertices: int) -> List[Set[int]]:
+    """Neighbors of each vertex from an encoded edge set"""
+    neighbors: List[Set[int]] = [set() for _ in range(nb_vertices)]
+    for edge in edges:
+        vertex1, vertex2 = divmod(edge, nb_vertices)
+        neighbors[vertex1].add(vertex2)
+        neighbors[vertex2].add(vertex1)
+    return neighbors
+
+
+def verify_step(
+    conv_file: str,
+    old_weights: List[int],
+    old_edges: Set[int],
+    new_weights: List[int],
+    new_edges: Set[int],
+) -> Tuple[List[str], int, int]:
+    """Check one conversion file between the graph before the reduction step (old)
+    and the graph after the reduction step (new)
+
+    The vertices of the g lines are only checked to be removed as the cliques
+    used by the first reduction are not saved.
+
+    :return: errors, number of g lines, number of s lines
+    :rtype: Tuple[List[str], int, int]
+    """
+    errors: List[str] = []
+    old_n = len(old_weights)
+    new_n = len(new_weights)
+    different_number, greedy, same_color = load_conversion_lines(conv_file)
+    # each vertex of the old graph is in exactly one line
+    listed = (
+        [old for old, _ in different_number]
+        + greedy
+        + [vertex for vertex, _ in same_color]
+    )
+    if sorted(listed) != list(range(old_n)):
+        errors.append(f"{conv_file} : vertices not listed exactly once")
+        return errors, len(greedy), len(same_color)
+    # d lines are a bijection between kept vertices and new vertices
+    if sorted(new for _, new in different_number) != list(range(new_n)):
+        errors.append(f"{conv_file} : d lines are not a bijection to [0, {new_n}[")
+        return errors, len(greedy), len(same_color)
+    mapping = [-1] * old_n
+    for old, new in different_number:
+        mapping[old] = new
+        if old_weights[old] != new_weights[new]:
+            errors.append(
+                f"{conv_file} : weight of {old} ({old_weights[old]}) "
+                f"changed in {new} ({new_weights[new]})"
+            )
+    # the new graph is the subgraph induced by the kept vertices
+    induced_edges = set()
+    for edge in old_edges:
+        vertex1, vertex2 = mapping[edge // old_n], mapping[edge % old_n]
+        if vertex1 != -1 and vertex2 != -1:
+            induced_edges.add(min(vertex1, vertex2) * new_n + max(vertex1, vertex2))
+    if induced_edges != new_edges:
+        errors.append(
+            f"{conv_file} : {len(induced_edges - new_edges)} induced edges missing, "
+            f"{len(new_edges - induced_edges)} edges added"
+        )
+    # new vertices are sorted by weight and degree
+    new_degrees = [0] * new_n
+    for edge in new_edges:
+        new_degrees[edge // new_n] += 1
+        new_degrees[edge % new_n] += 1
+    keys = list(zip(new_weights, new_degrees))
+    if any(keys[v] < keys[v + 1] for v in range(new_n - 1)):
+        errors.append(f"{conv_file} : vertices not sorted by weight and degree")
+    # s vertices are dominated by a kept vertex in the graph without g vertices
+    old_neighbors = neighborhoods(old_edges, old_n) if same_color else []
+    greedy_set = set(greedy)
+    for vertex, dominator in same_color:
+        if mapping[dominator] == -1:
+            errors.append(f"{conv_file} : s {vertex} {dominator}, {dominator} not kept")
+        elif dominator in old_neighbors[vertex]:
+            errors.append(f"{conv_file} : s {vertex} {dominator}, adjacent vertices")
+        elif old_weights[dominator] < old_weights[vertex]:
+            errors.append(f"{conv_file} : s {vertex} {dominator}, {dominator} lighter")
+        elif not (old_neighbors[vertex] - greedy_set) <= old_neighbors[dominator]:
+            errors.append(f"{conv_file} : s {vertex} {dominator}, not dominated")
+    return errors, len(greedy), len(same_color)
+
+
+def verify_instance(
+    path_to_instance_rep: str,
+    instance: str,
+    summary: Optional[Tuple[int, int, int]],
+) -> List[str]:
+    """Check the chain of conversion files and the reduced graph of the instance
+
+    :param path_to_instance_rep: path to the repository of instances
+    :type path_to_instance_rep: str
+    :param instance: name of the instance
+    :type instance: str
+    :param summary: nb_vertices, first_reduction and second_reduction from
+                    summary_reduction.csv (None if the instance is not in it)
+    :type summary: Optional[Tuple[int, int, int]]
+    :raises FileNotFoundError: if a file of the instance is missing
+    :return: list of errors (empty if the instance is consistent)
+    :rtype: List[str]
+    """
+    errors: List[str] = []
+    base = f"{path_to_instance_rep}/wvcp_original/{instance}"
+    weights = load_weights(f"{base}.col.w")
+    edges = load_edges(f"{base}.edgelist", len(weights))
+    nb_vertices = len(weights)
+    nb_greedy = 0
+    nb_same = 0
+    steps = conversion_steps(path_to_instance_rep, instance)
+    if not steps:
+        return [f"{instance} : no conversion files"]
+    for step in steps:
+        new_weights = load_weights(f"{step}.col.w")
+        new_edges = load_edges(f"{step}.edgelist", len(new_weights))
+        step_errors, step_greedy, step_same = verify_step(
+            f"{step}.conv", weights, edges, new_weights, new_edges
+        )
+        errors += step_errors
+        nb_greedy += step_greedy
+        nb_same += step_same
+        weights, edges = new_weights, new_edges
+    # the reduced graph is the graph of the last step
+    base = f"{path_to_instance_rep}/wvcp_reduced/{instance}"
+    nb_reduced = len(weights)
+    if load_weights(f"{base}.col.w") != weights:
+        errors.append(f"{base}.col.w : weights differ from {steps[-1]}.col.w")
+    if load_edges(f"{base}.edgelist", nb_reduced) != edges:
+        errors.append(f"{base}.edgelist : edges differ from {steps[-1]}.edgelist")
+    for extension in (".col", ".wcol"):
+        nb_vertices_p, nb_edges, dimacs_edges, dimacs_weights = load_dimacs(
+            f"{base}{extension}", nb_reduced
+        )
+        if nb_vertices_p != nb_reduced:
+            errors.append(f"{base}{extension} : {nb_vertices_p} vertices announced")
+        if nb_edges != len(edges) or dimacs_edges != edges:
+            errors.append(f"{base}{extension} : edges differ from {base}.edgelist")
+        if extension == ".wcol" and dimacs_weights != dict(enumerate(weights)):
+            errors.append(f"{base}{extension} : weights differ from {base}.col.w")
+    # the summary matches the conversion files
+    if summary is None:
+        errors.append(f"{instance} : not in summary_reduction.csv")
+    elif summary != (nb_vertices, nb_greedy, nb_same):
+        errors.append(
+            f"{instance} : summary {summary} instead of "
+            f"{(nb_vertices, nb_greedy, nb_same)}"
+        )
+    if nb_reduced != nb_vertices - nb_greedy - nb_same:
+        errors.append(f"{instance} : {nb_reduced} vertices left after reduction")
+    return errors
+
+
+def hash_instance(
+    path_to_instance_rep: str, instance: str, summary: Optional[Tuple[int, int, int]]
+) -> str:
+    """Hash the content of the files of the instance and its summary line"""
+    digest = hashlib.sha256(repr(summary).encode("utf8"))
+    for file_name in instance_files(path_to_instance_rep, instance):
+        digest.update(file_name.encode("utf8"))
+        if os.path.exists(file_name):
+            with open(file_name, "rb") as file:
+                digest.update(hashlib.sha256(file.read()).digest())
+    return digest.hexdigest()
+
+
+def _verify_job(
+    job: Tuple[str, str, Optional[Tuple[int, int, int]], Optional[str]]
+) -> Tuple[str, str, str, List[str]]:
+    """Verify an instance if its files changed since the last verification
+
+    :return: instance, hash, status (cached, ok, error or skipped), errors
+    :rtype: Tuple[str, str, str, List[str]]
+    """
+    path_to_instance_rep, instance, summary, previous_hash = job
+    current_hash = hash_instance(path_to_instance_rep, instance, summary)
+    if current_hash == previous_hash:
+        return instance, current_hash, "cached", []
+    try:
+        errors = verify_instance(path_to_instance_rep, instance, summary)
+    except FileNotFoundError as error:
+        return instance, current_hash, "skipped", [f"missing file {error.filename}"]
+    except (ValueError, IndexError) as error:
+        return instance, current_hash, "error", [f"malformed file {error}"]
+    return instance, current_hash, "error" if errors else "ok", errors
+
+
+def load_summary(path_to_instance_rep: str) -> Dict[str, Tuple[int, int, int]]:
+    """Load summary_reduction.csv"""
+    with open(
+        f"{path_to_instance_rep}/summary_reduction.csv", "r", encoding="utf8"
+    ) as file:
+        return {
+            row["instance"]: (
+                int(row["nb_vertices"]),
+                int(row["first_reduction"]),
+                int(row["second_reduction"]),
+            )
+            for row in csv.DictReader(file)
+        }
+
+
+def verify_all(
+    path_to_instance_rep: str = ".",
+    processes: Optional[int] = None,
+    cache_file: Optional[str] = CACHE_FILE,
+    full: bool = False,
+) -> Dict[str, Tuple[str, List[str]]]:
+    """Verify all instances of the summary and of wvcp_original in parallel
+
+    Only instances whose files changed since the last successful verification
+    are checked again (hashes saved in cache_file, None to not use a cache).
+
+    :param path_to_instance_rep: path to the repository of instances
+    :type path_to_instance_rep: str
+    :param processes: number of processes, defaults to None (number of cpus)
+    :type processes: Optional[int]
+    :param cache_file: file with the hashes of the verified instances
+    :type cache_file: Optional[str]
+    :param full: verify all instances but still save the hashes, defaults to False
+    :type full: bool
+    :return: status and errors of each instance
+    :rtype: Dict[str, Tuple[str, List[str]]]
+    """
+    summary = load_summary(path_to_instance_rep)
+    instances = sorted(
+        set(summary)
+        | {
+            instance.split("/")[-1][: -len(".col.w")]
+            for instance in glob(f"{path_to_instance_rep}/wvcp_original/*.col.w")
+        }
+    )
+    cache: Dict[str, str] = {}
+    cache_path = f"{path_to_instance_rep}/{cache_file}" if cache_file else None
+    if cache_path and not full and os.path.exists(cache_path):
+        with open(cache_path, "r", encoding="utf8") as file:
+            cache = json.load(file)
+    jobs = [
+        (path_to_instance_rep, instance, summary.get(instance), cache.get(instance))
+        for instance in instances
+    ]
+    results: Dict[str, Tuple[str, List[str]]] = {}
+    new_cache: Dict[str, str] = {}
+    with multiprocessing.Pool(processes) as pool:
+        for instance, current_hash, status, errors in pool.imap_unordered(
+            _verify_job, jobs
+        ):
+            results[instance] = (status, errors)
+            if status in ("ok", "cached"):
+                new_cache[instance] = current_hash
+    if cache_path:
+        with open(cache_path, "w", encoding="utf8") as file:
+            json.dump(dict(sorted(new_cache.items())), file, indent=0)
+    return dict(sorted(results.items()))
@@ -20,3 +20,31 @@
 #     ),
 #     score=175,
 # )
+
+
+# to share a graph between several processes without copying it
+# (handles are released by close() or at exit, the last one removes the segment)
+# from graph_reduction.graph import load_graph, share_graph, attach_graph
+# from graph_reduction.conversion import load_conversion
+
+# shared_graph = share_graph(
+#     load_graph("conversion/DSJR500.1_1.edgelist", "conversion/DSJR500.1_1.col.w"),
+#     load_conversion("conversion/DSJR500.1_1.conv"),
+# )
+# in the other processes : graph = attach_graph(shared_graph.shm_name)
+# (or give the handle to the process, it attaches to the graph when unpickled)
+
+
+# to check that a faster implementation gives the same outputs as the reference
+# (random graphs and original instances, failing cases are shrunk)
+# from graph_reduction.equivalence import register, check_all
+
+# register("reduction_2", "my_reduction_2", my_reduction_2)
+# check_all(nb_random_cases=200, path_to_instance_rep=".", max_vertices=250)
+
+
+# to measure the reduction on generated graphs larger than the instances
+# from graph_reduction.benchmark import scaling_benchmark, plot_benchmark
+
+# rows = scaling_benchmark(sizes=[2000, 5000, 10000], densities=[0.01, 0.1])
+# plot_benchmark(rows, "benchmark_scaling.png")
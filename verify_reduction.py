@@ -0,0 +1,40 @@
+"""
+Use this script to check that the reduced instances and the conversion files
+are consistent with the original instances.
+Optional parameters : number of processes, --full to verify all instances
+(the cache is still updated)
+
+example (print the errors and exit 1 if an instance is inconsistent or has
+missing files, except the instances of KNOWN_INCOMPLETE):
+    python3 verify_reduction.py
+    python3 verify_reduction.py 8 --full
+
+"""
+from graph_reduction.verification import verify_all, CACHE_FILE, KNOWN_INCOMPLETE
+
+import sys
+
+if __name__ == "__main__":
+    arguments = [argument for argument in sys.argv[1:] if argument != "--full"]
+    results = verify_all(
+        path_to_instance_rep=".",
+        processes=int(arguments[0]) if arguments else None,
+        cache_file=CACHE_FILE,
+        full="--full" in sys.argv,
+    )
+    statuses = [status for status, _ in results.values()]
+    print(
+        ", ".join(
+            f"{statuses.count(status)} {status}"
+            for status in ("ok", "cached", "skipped", "error")
+        )
+    )
+    for instance, (status, errors) in results.items():
+        if status in ("skipped", "error"):
+            for error in errors:
+                print(f"{status} {instance} : {error}")
+    if any(
+        status == "error" or (status == "skipped" and instance not in KNOWN_INCOMPLETE)
+        for instance, (status, _) in results.items()
+    ):
+        exit(1)